@@ -3,29 +3,45 @@
 """Скрипт для очистки CSV файла от проблемных кавычек"""
 
 import os
+import mmap
+
+# Прямые (" и ') и типографские (“ ” ‘ ’) кавычки в байтах UTF-8
+_ASCII_QUOTES = b'"\''
+_CURLY_QUOTES = tuple(quote.encode('utf-8') for quote in '\u201c\u201d\u2018\u2019')
+_QUOTE_BYTES = tuple(bytes([quote]) for quote in _ASCII_QUOTES) + _CURLY_QUOTES
 
 def clean_csv_file(output_file):
-    """Очищает CSV файл от проблемных кавычек: ", ' и " """
+    """Очищает CSV файл от проблемных кавычек: ", ', “, ”, ‘ и ’"""
     
     if not os.path.exists(output_file):
         print(f"Файл {output_file} не найден!")
         return
     
     try:
-        # Читаем файл построчно
-        with open(output_file, 'r', encoding='utf-8-sig') as f:
-            lines = f.readlines()
-        
-        # Очищаем каждую строку от проблемных кавычек
-        cleaned_lines = []
-        for line in lines:
-            # Удаляем только проблемные кавычки: ", ' и "
-            cleaned_line = line.replace('"', '').replace("'", '').replace('"', '')
-            cleaned_lines.append(cleaned_line)
-        
-        # Записываем обратно
-        with open(output_file, 'w', encoding='utf-8-sig', newline='') as f:
-            f.writelines(cleaned_lines)
+        with open(output_file, 'r+b') as f:
+            # Пустой файл нельзя отобразить в память, и чистить в нем нечего
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            
+            # Работаем с файлом через mmap, без построчного чтения в список
+            with mmap.mmap(f.fileno(), 0) as mm:
+                # Если кавычек нет, файл не копируется и не перезаписывается
+                if not any(mm.find(quote) != -1 for quote in _QUOTE_BYTES):
+                    size = None
+                else:
+                    # Прямые кавычки удаляются bytes.translate, а типографские
+                    # (многобайтные в UTF-8) - цепочкой bytes.replace
+                    cleaned = mm[:].translate(None, _ASCII_QUOTES)
+                    for quote in _CURLY_QUOTES:
+                        cleaned = cleaned.replace(quote, b'')
+                    
+                    size = len(cleaned)
+                    mm[:size] = cleaned
+                    mm.flush()
+            
+            # Обрезаем хвост файла после закрытия отображения
+            if size is not None:
+                f.truncate(size)
         
         print(f"✓ Файл {output_file} очищен от проблемных кавычек")
     except Exception as e:
@@ -1,11 +1,148 @@
 import re
 import json
 import csv
+import html
+import asyncio
+from collections import defaultdict, deque
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin
 import os
+import mmap
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
 import time
+from uuid import uuid4
+
+# lxml (C-расширение) разбирает HTML на порядок быстрее BeautifulSoup;
+# если он не установлен, откатываемся на BeautifulSoup со встроенным html.parser
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+SITE_URL = 'https://www.papadontpreach.com'
+PAGE_ENCODING = 'utf-8'
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Сколько страниц скачивается одновременно
+MAX_CONCURRENT_REQUESTS = 8
+
+# Минимальная пауза между запросами к одному хосту (в секундах),
+# чтобы не перегружать сервер
+REQUEST_DELAY = 1
+
+# Заголовки CSV в формате TSUM
+FIELDNAMES = [
+    'URL', 'ID', 'Name', 'Brand', 'Article', 'Gender',
+    'Image2', 'Ext Images', 'Description', 'Sizes', 'Color',
+    'Category', 'ID2', 'Combine'
+]
+
+# Таблица для str.translate: удаляет прямые (" и ') и типографские (“ ” ‘ ’) кавычки
+_QUOTE_TABLE = str.maketrans('', '', '"\'\u201c\u201d\u2018\u2019')
+# Те же кавычки в байтах для очистки файла через mmap
+_ASCII_QUOTES = b'"\''
+_CURLY_QUOTES = tuple(quote.encode('utf-8') for quote in '\u201c\u201d\u2018\u2019')
+_QUOTE_BYTES = tuple(bytes([quote]) for quote in _ASCII_QUOTES) + _CURLY_QUOTES
+
+# Общая сессия для синхронных запросов: TCP/TLS соединения с сайтом
+# переиспользуются, а не открываются заново для каждой страницы
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=16))
+
+# Регулярные выражения компилируются один раз при импорте модуля
+_KIWI_RE = re.compile(r'KiwiSizing\.data\s*=\s*({.*?});', re.DOTALL)
+_PRODUCT_RE = re.compile(r'product:\s*"([^"]+)"')
+_TITLE_RE = re.compile(r'title:\s*"([^"]+)"')
+_VENDOR_RE = re.compile(r'vendor:\s*"([^"]+)"')
+_TYPE_RE = re.compile(r'type:\s*"([^"]+)"')
+# Массивы images и variants для запасного метода ищутся за один проход по HTML
+_KIWI_LISTS_RE = re.compile(r'(images|variants):\s*\[(.*?)\]', re.DOTALL)
+_IMG_URL_RE = re.compile(r'"([^"]+)"')
+_VARIANT_BLOCK_RE = re.compile(r'\{"id":\d+.*?"public_title":"([^"]+)".*?"sku":"([^"]+)"')
+_SWYM_RE = re.compile(r'window\.SwymProductInfo\.product\s*=\s*({.*?});', re.DOTALL)
+_SAVED_URL_RE = re.compile(r'saved from url=\([^)]+\)(https://[^\s]+)')
+_KEY_RE = re.compile(r'([{,]\s*)(\w+)\s*:')
+# Строковые литералы захватываются первой группой и остаются как есть
+_TRAILING_COMMA_RE = re.compile(r'("(?:\\.|[^"\\])*")|,(\s*[}\]])')
+
+# Для трех тегов из <head> не нужно строить DOM всей страницы - хватает регулярок
+# Сначала находим тег целиком, затем читаем его атрибуты в любом порядке
+_LINK_TAG_RE = re.compile(r'<link\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>', re.I)
+_META_TAG_RE = re.compile(r'<meta\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>', re.I)
+_ATTR_RE = re.compile(r'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+
+
+def absolute_url(url, base=SITE_URL):
+    """Преобразует относительный URL изображения в абсолютный"""
+    if url.startswith('//'):
+        return 'https:' + url
+    if url.startswith('/'):
+        return base + url
+    return url
+
+
+def find_tag_attribute(tag_pattern, key_attr, key_value, value_attr, html_content):
+    """Возвращает value_attr первого тега, у которого key_attr содержит key_value"""
+    for tag in tag_pattern.finditer(html_content):
+        attrs = {}
+        for name, double, single, bare in _ATTR_RE.findall(tag.group(0)):
+            attrs.setdefault(name.lower(), html.unescape(double or single or bare))
+        # Как и в BeautifulSoup, rel может содержать несколько значений через пробел
+        if key_value in attrs.get(key_attr, '').split() and value_attr in attrs:
+            return attrs[value_attr]
+    return ''
+
+
+class TextTarget:
+    """Цель для парсера lxml: собирает текст без построения дерева документа"""
+    
+    # Содержимое этих тегов get_text() в BeautifulSoup не считает текстом
+    SKIP_TAGS = frozenset(('script', 'style', 'template'))
+    
+    def __init__(self):
+        self.parts = []
+        self.skip_depth = 0
+    
+    def start(self, tag, attrib):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+        # Границы тегов разделяют текст пробелом, как get_text(separator=' ')
+        self.parts.append(' ')
+    
+    def end(self, tag):
+        if tag in self.SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        self.parts.append(' ')
+    
+    def data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+    
+    def close(self):
+        text = ' '.join(''.join(self.parts).split())
+        # Цель переиспользуется между разборами, поэтому сбрасываем накопленное
+        self.parts = []
+        self.skip_depth = 0
+        return text
+
+
+# Один парсер на все описания: контекст libxml2 и его словарь имен тегов
+# создаются один раз, а не заново для каждой страницы
+_TEXT_PARSER = etree.HTMLParser(target=TextTarget(), recover=True) if etree is not None else None
+
+
+def html_to_text(description_html):
+    """Удаляет HTML теги, склеивая текстовые фрагменты через пробел"""
+    if _TEXT_PARSER is None:
+        return BeautifulSoup(description_html, 'html.parser').get_text(separator=' ', strip=True)
+    
+    return etree.fromstring(description_html, _TEXT_PARSER)
 
 
 def js_to_json(js_str):
@@ -24,7 +161,10 @@ def js_to_json(js_str):
         return f'{prefix}"{key}":'
     
     # Заменяем ключи без кавычек (но не внутри строковых значений)
-    js_str = re.sub(r'([{,]\s*)(\w+)\s*:', add_quotes_to_keys, js_str)
+    js_str = _KEY_RE.sub(add_quotes_to_keys, js_str)
+    
+    # Убираем висячие запятые перед } и ], которые допустимы в JavaScript
+    js_str = _TRAILING_COMMA_RE.sub(lambda match: match.group(1) or match.group(2), js_str)
     
     # Заменяем true/false/null на их JSON эквиваленты (они уже правильные)
     # Ничего не делаем, они уже в правильном формате
@@ -33,79 +173,69 @@ def js_to_json(js_str):
 
 
 def extract_product_data(html_content, product_url=None):
-    """Извлекает данные о товаре из HTML"""
+    """Извлекает данные о товаре из HTML (str или bytes в UTF-8)"""
     
-    soup = BeautifulSoup(html_content, 'html.parser')
+    # Сайт отдает страницы в UTF-8, поэтому байты декодируем сами,
+    # без определения кодировки по содержимому
+    if isinstance(html_content, bytes):
+        html_content = html_content.decode(PAGE_ENCODING)
     
     # Извлекаем данные из JavaScript объекта KiwiSizing.data
-    kiwi_data_match = re.search(r'KiwiSizing\.data\s*=\s*({.*?});', html_content, re.DOTALL)
+    kiwi_data_match = _KIWI_RE.search(html_content)
     
     if not kiwi_data_match:
         print("Не найдены данные KiwiSizing.data")
         return None
     
-    # Используем альтернативный метод через регулярные выражения
-    # так как JavaScript объект сложно преобразовать в JSON
-    # Если URL не передан, пытаемся извлечь из HTML
-    if not product_url:
-        url_match = re.search(r'saved from url=\([^)]+\)(https://[^\s]+)', html_content)
-        product_url = url_match.group(1) if url_match else None
-        
-        if not product_url:
-            canonical = soup.find('link', {'rel': 'canonical'})
-            if canonical:
-                product_url = canonical.get('href', '')
-    
-    return extract_product_data_regex(html_content, product_url)
+    # Разбираем объект одним вызовом json.loads; если его не удалось
+    # привести к JSON, используем альтернативный метод через регулярные выражения
+    try:
+        kiwi_data = json.loads(js_to_json(kiwi_data_match.group(1)))
+    except ValueError:
+        return extract_product_data_regex(html_content, product_url)
     
     # Используем общую функцию обработки данных
-    return process_kiwi_data(kiwi_data, html_content, soup)
+    return process_kiwi_data(kiwi_data, html_content, product_url)
 
 
 def extract_product_data_regex(html_content, product_url=None):
     """Альтернативный метод извлечения данных через регулярные выражения"""
     
-    soup = BeautifulSoup(html_content, 'html.parser')
     kiwi_data = {}
     
-    # Извлекаем product ID
-    product_match = re.search(r'product:\s*"([^"]+)"', html_content)
-    if product_match:
-        kiwi_data['product'] = product_match.group(1)
-    
-    # Извлекаем title
-    title_match = re.search(r'title:\s*"([^"]+)"', html_content)
-    if title_match:
-        kiwi_data['title'] = title_match.group(1)
-    
-    # Извлекаем vendor
-    vendor_match = re.search(r'vendor:\s*"([^"]+)"', html_content)
-    if vendor_match:
-        kiwi_data['vendor'] = vendor_match.group(1)
-    
-    # Извлекаем type
-    type_match = re.search(r'type:\s*"([^"]+)"', html_content)
-    if type_match:
-        kiwi_data['type'] = type_match.group(1)
+    # Простые поля ищем по отдельности: каждый поиск находит первое вхождение
+    for key, pattern in (('product', _PRODUCT_RE), ('title', _TITLE_RE),
+                         ('vendor', _VENDOR_RE), ('type', _TYPE_RE)):
+        match = pattern.search(html_content)
+        if match:
+            kiwi_data[key] = match.group(1)
+    
+    # Массивы ищем за один проход и берем первый найденный для каждого ключа.
+    # finditer не возвращает пересекающиеся совпадения, поэтому ключ внутри
+    # уже найденного массива (например, images: [...] внутри variants: [...])
+    # пропускается
+    lists = {}
+    for match in _KIWI_LISTS_RE.finditer(html_content):
+        lists.setdefault(match.group(1), match.group(2))
+        if len(lists) == 2:
+            break
     
     # Извлекаем images (массив)
-    images_match = re.search(r'images:\s*\[(.*?)\]', html_content, re.DOTALL)
-    if images_match:
-        images_str = images_match.group(1)
+    images_str = lists.get('images')
+    if images_str is not None:
         # Извлекаем все URL из массива
-        image_urls = re.findall(r'"([^"]+)"', images_str)
+        image_urls = _IMG_URL_RE.findall(images_str)
         # Очищаем от экранированных слешей
         image_urls = [url.replace('\\/', '/') for url in image_urls]
         kiwi_data['images'] = image_urls
     
     # Извлекаем variants (размеры и SKU)
-    variants_match = re.search(r'variants:\s*\[(.*?)\]', html_content, re.DOTALL)
+    variants_str = lists.get('variants')
     variants = []
-    if variants_match:
-        variants_str = variants_match.group(1)
+    if variants_str is not None:
         # Извлекаем все варианты как отдельные объекты
         # Каждый вариант начинается с {"id":...
-        variant_blocks = re.findall(r'\{"id":\d+.*?"public_title":"([^"]+)".*?"sku":"([^"]+)"', variants_str)
+        variant_blocks = _VARIANT_BLOCK_RE.findall(variants_str)
         
         for public_title, sku in variant_blocks:
             variants.append({'public_title': public_title, 'sku': sku})
@@ -113,24 +243,20 @@ def extract_product_data_regex(html_content, product_url=None):
     kiwi_data['variants'] = variants
     
     # Теперь используем те же методы обработки
-    return process_kiwi_data(kiwi_data, html_content, soup, product_url)
+    return process_kiwi_data(kiwi_data, html_content, product_url)
 
 
-def process_kiwi_data(kiwi_data, html_content, soup, product_url=None):
+def process_kiwi_data(kiwi_data, html_content, product_url=None):
     """Обрабатывает данные из kiwi_data и возвращает готовый словарь для CSV"""
     
     # Извлекаем URL страницы
     if not product_url:
-        url_match = re.search(r'saved from url=\([^)]+\)(https://[^\s]+)', html_content)
+        url_match = _SAVED_URL_RE.search(html_content)
         if url_match:
             product_url = url_match.group(1)
         else:
             # Пробуем найти в canonical link
-            canonical = soup.find('link', {'rel': 'canonical'})
-            if canonical:
-                product_url = canonical.get('href', '')
-            else:
-                product_url = ''
+            product_url = find_tag_attribute(_LINK_TAG_RE, 'rel', 'canonical', 'href', html_content)
     
     # Извлекаем название товара
     title = kiwi_data.get('title', '')
@@ -145,55 +271,20 @@ def process_kiwi_data(kiwi_data, html_content, soup, product_url=None):
     product_id = kiwi_data.get('product', '')
     
     # Извлекаем изображения
-    images = kiwi_data.get('images', [])
+    images = kiwi_data.get('images') or []
     
     # Обрабатываем изображения согласно требованиям
     # IMAGE2 = первое фото (индекс 0)
     # EXT IMAGES = второе и третье фото (индексы 1 и 2), если они есть
-    image2 = ''
-    ext_images = ''
-    
-    if len(images) > 0:
-        # Преобразуем относительный URL в абсолютный
-        first_image = images[0]
-        if first_image.startswith('//'):
-            image2 = 'https:' + first_image
-        elif first_image.startswith('/'):
-            image2 = 'https://www.papadontpreach.com' + first_image
-        else:
-            image2 = first_image
-    
-    # Обрабатываем EXT IMAGES
-    if len(images) >= 3:
-        # Если есть 3+ фото, берем 2-е и 3-е
-        img2 = images[1]
-        img3 = images[2]
-        
-        if img2.startswith('//'):
-            img2 = 'https:' + img2
-        elif img2.startswith('/'):
-            img2 = 'https://www.papadontpreach.com' + img2
-            
-        if img3.startswith('//'):
-            img3 = 'https:' + img3
-        elif img3.startswith('/'):
-            img3 = 'https://www.papadontpreach.com' + img3
-        
-        ext_images = f"{img2},{img3}"
-    elif len(images) == 2:
-        # Если только 2 фото, берем только 2-е
-        img2 = images[1]
-        if img2.startswith('//'):
-            img2 = 'https:' + img2
-        elif img2.startswith('/'):
-            img2 = 'https://www.papadontpreach.com' + img2
-        ext_images = img2
     # Если только 1 фото, ext_images остается пустым
+    abs_images = [absolute_url(url) for url in images[:3]]
+    image2 = abs_images[0] if abs_images else ''
+    ext_images = ','.join(abs_images[1:3])
     
     # Извлекаем описание
     description = ''
     # Пробуем найти описание в SwymProductInfo
-    swym_match = re.search(r'window\.SwymProductInfo\.product\s*=\s*({.*?});', html_content, re.DOTALL)
+    swym_match = _SWYM_RE.search(html_content)
     if swym_match:
         try:
             swym_data_str = swym_match.group(1)
@@ -202,32 +293,26 @@ def process_kiwi_data(kiwi_data, html_content, soup, product_url=None):
             description_html = swym_data.get('description', '')
             # Удаляем HTML теги из описания
             if description_html:
-                desc_soup = BeautifulSoup(description_html, 'html.parser')
-                description = desc_soup.get_text(separator=' ', strip=True)
+                description = html_to_text(description_html)
         except:
             pass
     
     # Если описание не найдено, пробуем найти в meta description
     if not description:
-        meta_desc = soup.find('meta', {'name': 'description'})
-        if meta_desc:
-            description = meta_desc.get('content', '')
+        description = find_tag_attribute(_META_TAG_RE, 'name', 'description', 'content', html_content)
     
     # Если описание все еще пустое, пробуем найти в og:description
     if not description:
-        og_desc = soup.find('meta', {'property': 'og:description'})
-        if og_desc:
-            description = og_desc.get('content', '')
+        description = find_tag_attribute(_META_TAG_RE, 'property', 'og:description', 'content', html_content)
     
     # Извлекаем размеры из вариантов
-    sizes = []
-    variants = kiwi_data.get('variants', [])
-    for variant in variants:
-        size = variant.get('public_title', '')
-        if size and size not in sizes:
-            sizes.append(size)
+    # dict.fromkeys убирает повторы за один проход, сохраняя порядок
+    variants = kiwi_data.get('variants') or []
+    sizes = dict.fromkeys(
+        variant.get('public_title') for variant in variants if variant.get('public_title')
+    )
     
-    sizes_str = ','.join(sizes) if sizes else ''
+    sizes_str = ','.join(sizes)
     
     # Извлекаем артикул (SKU) - берем первый вариант
     article = ''
@@ -235,8 +320,7 @@ def process_kiwi_data(kiwi_data, html_content, soup, product_url=None):
         article = variants[0].get('sku', '')
     
     # Генерируем ID2 (UUID-подобный формат)
-    import uuid
-    id2 = str(uuid.uuid4())
+    id2 = str(uuid4())
     
     # Цвет и пол - пока оставляем пустыми, так как в данных нет явной информации
     color = ''
@@ -264,8 +348,9 @@ def parse_html_file(html_file_path):
     """Парсит HTML файл и возвращает данные о товаре"""
     
     try:
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+        # Декодируем строго: файл не в UTF-8 - это ошибка чтения, а не текст с заменами
+        with open(html_file_path, 'rb') as f:
+            html_content = f.read().decode(PAGE_ENCODING)
     except Exception as e:
         print(f"Ошибка чтения файла: {e}")
         return None
@@ -277,13 +362,11 @@ def download_html(url):
     """Скачивает HTML страницу по URL"""
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
+        response = _SESSION.get(url, timeout=30)
         response.raise_for_status()
-        return response.text
-    except requests.exceptions.RequestException as e:
+        # Декодируем байты сами: requests не нужно угадывать кодировку страницы
+        return response.content.decode(PAGE_ENCODING)
+    except (requests.exceptions.RequestException, UnicodeDecodeError) as e:
         print(f"Ошибка при скачивании {url}: {e}")
         return None
 
@@ -308,25 +391,131 @@ def parse_url(url):
     return product_data
 
 
+class HostThrottle:
+    """Выдерживает паузу между запросами к одному и тому же хосту"""
+    
+    def __init__(self, delay=REQUEST_DELAY):
+        self.delay = delay
+        self.locks = defaultdict(asyncio.Lock)
+        self.last_request = {}
+    
+    async def wait(self, url):
+        """Ждет, пока к хосту из url снова можно обратиться"""
+        host = urlparse(url).netloc
+        async with self.locks[host]:
+            last = self.last_request.get(host)
+            if last is not None:
+                pause = self.delay - (time.monotonic() - last)
+                if pause > 0:
+                    await asyncio.sleep(pause)
+            self.last_request[host] = time.monotonic()
+
+
+async def download_html_async(session, url):
+    """Асинхронно скачивает HTML страницу по URL"""
+    
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+            response.raise_for_status()
+            # Декодируем байты сами: aiohttp не нужно угадывать кодировку страницы
+            return (await response.read()).decode(PAGE_ENCODING)
+    except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError) as e:
+        print(f"Ошибка при скачивании {url}: {e}")
+        return None
+
+
+async def parse_url_async(session, throttle, url, position, total):
+    """Асинхронно скачивает и парсит товар по URL"""
+    
+    await throttle.wait(url)
+    print(f"\n[{position}/{total}] Обработка: {url}")
+    html_content = await download_html_async(session, url)
+    
+    if not html_content:
+        print(f"✗ Не удалось обработать: {url}")
+        return None
+    
+    # Парсинг занимает процессор, поэтому выполняется синхронно
+    product_data = extract_product_data(html_content, url)
+    
+    if not product_data:
+        print(f"✗ Не удалось обработать: {url}")
+        return None
+    
+    # Убеждаемся, что URL установлен
+    if not product_data.get('URL'):
+        product_data['URL'] = url
+    
+    print(f"✓ Успешно обработан: {product_data.get('Name', 'N/A')}")
+    return product_data
+
+
+async def parse_urls_async(links):
+    """Параллельно обрабатывает ссылки и отдает результаты (или None) в исходном порядке"""
+    
+    throttle = HostThrottle()
+    pending_links = enumerate(links, 1)
+    
+    # Одна сессия на все запросы - соединения переиспользуются
+    async with aiohttp.ClientSession(headers=HEADERS) as session:
+        def schedule_next():
+            """Запускает задачу для следующей ссылки, если ссылки еще остались"""
+            item = next(pending_links, None)
+            if item is not None:
+                i, url = item
+                window.append(asyncio.ensure_future(
+                    parse_url_async(session, throttle, url, i, len(links))
+                ))
+        
+        # Окно из MAX_CONCURRENT_REQUESTS задач ограничивает и число одновременных
+        # запросов, и число готовых товаров в памяти: новая ссылка запускается
+        # только после того, как отдан первый результат
+        window = deque()
+        for _ in range(MAX_CONCURRENT_REQUESTS):
+            schedule_next()
+        
+        try:
+            while window:
+                product_data = await window[0]
+                window.popleft()
+                schedule_next()
+                yield product_data
+        finally:
+            for task in window:
+                task.cancel()
+
+
+async def stream_urls_to_csv(links, output_file):
+    """Обрабатывает ссылки, дописывает товары в CSV и возвращает их количество"""
+    
+    saved = 0
+    with open(output_file, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = create_csv_writer(csvfile)
+        writer.writerow(FIELDNAMES)
+        
+        async for product_data in parse_urls_async(links):
+            if product_data:
+                writer.writerow(product_to_row(product_data))
+                # Сбрасываем на диск, чтобы результаты пережили падение скрипта
+                csvfile.flush()
+                saved += 1
+    
+    return saved
+
+
 def remove_quotes(value):
-    """Удаляет только проблемные кавычки из значения: ", ' и " """
+    """Удаляет только проблемные кавычки из значения: ", ', “, ”, ‘ и ’"""
     if value is None:
         return ''
     if isinstance(value, str):
-        # Удаляем только те кавычки, которые ломают CSV: ", ' и "
-        value = value.replace('"', '').replace("'", '').replace('"', '')
+        # Один проход translate вместо цепочки replace
+        value = value.translate(_QUOTE_TABLE)
     return value
 
 
-def clean_product_data(product_data):
-    """Очищает данные товара от кавычек"""
-    if not product_data:
-        return product_data
-    
-    cleaned = {}
-    for key, value in product_data.items():
-        cleaned[key] = remove_quotes(value)
-    return cleaned
+def product_to_row(product_data):
+    """Превращает данные товара в очищенную от кавычек строку CSV в порядке FIELDNAMES"""
+    return tuple(remove_quotes(product_data.get(name)) for name in FIELDNAMES)
 
 
 def clean_csv_file(output_file):
@@ -336,26 +525,41 @@ def clean_csv_file(output_file):
         return
     
     try:
-        # Читаем файл построчно
-        with open(output_file, 'r', encoding='utf-8-sig') as f:
-            lines = f.readlines()
-        
-        # Очищаем каждую строку от кавычек
-        cleaned_lines = []
-        for line in lines:
-            # Удаляем только проблемные кавычки: ", ' и "
-            cleaned_line = line.replace('"', '').replace("'", '').replace('"', '')
-            cleaned_lines.append(cleaned_line)
-        
-        # Записываем обратно
-        with open(output_file, 'w', encoding='utf-8-sig', newline='') as f:
-            f.writelines(cleaned_lines)
+        with open(output_file, 'r+b') as f:
+            # Пустой файл нельзя отобразить в память, и чистить в нем нечего
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            
+            # Работаем с файлом через mmap, без построчного чтения в список
+            with mmap.mmap(f.fileno(), 0) as mm:
+                # Если кавычек нет, файл не копируется и не перезаписывается
+                if not any(mm.find(quote) != -1 for quote in _QUOTE_BYTES):
+                    size = None
+                else:
+                    # Прямые кавычки удаляются bytes.translate, а типографские
+                    # (многобайтные в UTF-8) - цепочкой bytes.replace
+                    cleaned = mm[:].translate(None, _ASCII_QUOTES)
+                    for quote in _CURLY_QUOTES:
+                        cleaned = cleaned.replace(quote, b'')
+                    
+                    size = len(cleaned)
+                    mm[:size] = cleaned
+                    mm.flush()
+            
+            # Обрезаем хвост файла после закрытия отображения
+            if size is not None:
+                f.truncate(size)
         
         print(f"✓ Файл {output_file} очищен от кавычек")
     except Exception as e:
         print(f"Ошибка при очистке файла: {e}")
 
 
+def create_csv_writer(csvfile):
+    """Создает csv.writer для CSV в формате TSUM (строки - кортежи в порядке FIELDNAMES)"""
+    return csv.writer(csvfile, delimiter=';', quoting=csv.QUOTE_NONE, escapechar='\\')
+
+
 def save_to_csv(product_data_list, output_file='output.csv', append=False):
     """Сохраняет данные в CSV файл в формате TSUM"""
     
@@ -363,36 +567,27 @@ def save_to_csv(product_data_list, output_file='output.csv', append=False):
         print("Нет данных для сохранения")
         return
     
-    # Заголовки CSV в формате TSUM
-    fieldnames = [
-        'URL', 'ID', 'Name', 'Brand', 'Article', 'Gender',
-        'Image2', 'Ext Images', 'Description', 'Sizes', 'Color',
-        'Category', 'ID2', 'Combine'
-    ]
-    
     # Проверяем, существует ли файл
     file_exists = os.path.exists(output_file) and append
     
     mode = 'a' if append and file_exists else 'w'
     
     with open(output_file, mode, newline='', encoding='utf-8-sig') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, delimiter=';', quoting=csv.QUOTE_NONE, escapechar='\\')
+        writer = create_csv_writer(csvfile)
         
         # Записываем заголовки только если файл новый
         if not (append and file_exists):
-            writer.writeheader()
+            writer.writerow(FIELDNAMES)
         
-        # Записываем данные
-        for product_data in product_data_list:
-            if product_data:  # Пропускаем None значения
-                # Очищаем данные от кавычек перед записью
-                cleaned_data = clean_product_data(product_data)
-                writer.writerow(cleaned_data)
+        # Записываем данные одним вызовом, пропуская None значения;
+        # кавычки удаляются при построении строк
+        writer.writerows(
+            product_to_row(product_data)
+            for product_data in product_data_list
+            if product_data
+        )
     
     print(f"Сохранено {len([p for p in product_data_list if p])} записей в файл: {output_file}")
-    
-    # Дополнительная очистка файла от кавычек (на случай если они все же попали)
-    clean_csv_file(output_file)
 
 
 def read_links_from_file(links_file='links.txt'):
@@ -430,33 +625,12 @@ def main():
     print(f"Найдено {len(links)} ссылок для обработки")
     
     output_file = "Papa_Dont_Preach_output.csv"
-    all_products = []
     
-    # Обрабатываем каждую ссылку
-    for i, url in enumerate(links, 1):
-        print(f"\n[{i}/{len(links)}] Обработка: {url}")
-        
-        # Парсим URL
-        product_data = parse_url(url)
-        
-        if product_data:
-            # Убеждаемся, что URL установлен
-            if not product_data.get('URL'):
-                product_data['URL'] = url
-            
-            all_products.append(product_data)
-            print(f"✓ Успешно обработан: {product_data.get('Name', 'N/A')}")
-        else:
-            print(f"✗ Не удалось обработать: {url}")
-            all_products.append(None)  # Добавляем None для сохранения порядка
-        
-        # Небольшая задержка между запросами, чтобы не перегружать сервер
-        if i < len(links):
-            time.sleep(1)
+    # Обрабатываем ссылки параллельно и сразу записываем каждый товар в CSV
+    saved = asyncio.run(stream_urls_to_csv(links, output_file))
     
-    # Сохраняем все результаты в CSV
-    if all_products:
-        save_to_csv(all_products, output_file, append=False)
+    if saved:
+        print(f"Сохранено {saved} записей в файл: {output_file}")
         print(f"\n✓ Обработка завершена! Результаты сохранены в {output_file}")
     else:
         print("\n✗ Не удалось обработать ни одной ссылки")